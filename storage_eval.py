@@ -12,11 +12,32 @@ PyStorage-Eval: 电化学储能电站技术经济评价工具
 
 from __future__ import annotations
 
+import copy
+import csv
+import functools
 import logging
-from typing import Dict, Any, Optional, Literal
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Literal, Tuple, IO
 import pandas as pd
 import numpy as np
-import numpy_financial as npf
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba 为可选依赖, 缺失时核心函数以纯 Python 执行
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba.njit 的空实现: 原样返回被装饰函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
 
 # ==============================================================================
 # 常量定义 (依据 DLT2919-2025 和边界条件取值表)
@@ -47,6 +68,11 @@ class StorageConstants:
     # ========== 项目期限 ==========
     CONSTRUCT_PERIOD = 1                   # 建设期 (年)
     OPERATION_PERIOD = 20                  # 运营期 (年)
+    YEAR_LABELS = tuple(f'第{i}年' for i in range(1, OPERATION_PERIOD + 1))  # 报表年份标签
+
+    # ========== 单位换算 ==========
+    # 电量(MWh) × 电价(元/kWh) → 万元: × 1000 (kWh/MWh) / 10000 (元/万元)
+    MWH_PRICE_TO_WAN = 1000 / 10000
 
     # ========== 运维费率 (依据边界表) ==========
     OM_FEE_PER_KW = 30.0                   # 按功率: 30元/kW/年
@@ -62,9 +88,12 @@ class StorageConstants:
     # ========== 电池更换处理方式 ==========
     REPLACEMENT_EXPENSE = 'expense'        # 费用化 (当年一次性扣除)
     REPLACEMENT_CAPITALIZE = 'capitalize'  # 资本化 (计入固定资产)
+    REPLACEMENT_MODE_CODES = {             # 现金流内核使用的整数编码
+        REPLACEMENT_EXPENSE: 0,
+        REPLACEMENT_CAPITALIZE: 1,
+    }
 
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+# 日志 (输出配置由调用方决定, 库模块导入时不修改全局 logging 配置)
 logger = logging.getLogger(__name__)
 
 
@@ -87,6 +116,417 @@ class CalculationError(StorageProjectError):
     pass
 
 
+# ==============================================================================
+# 数值内核
+# ==============================================================================
+
+@njit(cache=True)
+def _npv(cf: np.ndarray, rate: float) -> float:
+    """按折现率 rate 计算现金流净现值 (第0项不折现)"""
+    npv = 0.0
+    discount = 1.0
+    for i in range(cf.shape[0]):
+        npv += cf[i] * discount
+        discount /= 1.0 + rate
+    return npv
+
+
+@njit(cache=True)
+def _irr_newton(cf: np.ndarray, guess: float = 0.08, tol: float = 1e-7, maxiter: int = 50) -> float:
+    """
+    求解现金流内部收益率 (IRR)
+
+    以 Newton-Raphson 迭代求 NPV(r) = 0 的根, NPV 及其解析导数在同一次循环中累加;
+    迭代发散或未收敛时退回 [-0.9999, 10.0] 区间二分法。
+    求解区间即 IRR 的可求范围: 低于 -99.99% 或高于 1000% 的 IRR 视为无解, 返回 NaN。
+
+    Args:
+        cf: 逐年净现金流 (第0项为建设期)
+        guess: 初始猜测值
+        tol: 收敛容差
+        maxiter: Newton 最大迭代次数
+
+    Returns:
+        IRR (小数形式)，无解时返回 NaN
+    """
+    n = cf.shape[0]
+    lo = -0.9999
+    hi = 10.0
+
+    r = guess
+    for _ in range(maxiter):
+        base = 1.0 + r
+        discount = 1.0
+        f = 0.0
+        fp = 0.0
+        for i in range(n):
+            f += cf[i] * discount
+            fp -= i * cf[i] * discount / base
+            discount /= base
+        if fp == 0.0:
+            break
+        step = f / fp
+        r -= step
+        # 越出求解区间视为发散
+        if not lo < r < hi:
+            break
+        if abs(step) < tol:
+            return r
+
+    # Newton 发散时回退二分法
+    f_lo = _npv(cf, lo)
+    f_hi = _npv(cf, hi)
+    if f_lo == 0.0:
+        return lo
+    if f_hi == 0.0:
+        return hi
+    if (f_lo > 0.0) == (f_hi > 0.0):
+        return np.nan
+
+    for _ in range(200):
+        mid = 0.5 * (lo + hi)
+        f_mid = _npv(cf, mid)
+        if (f_mid > 0.0) == (f_lo > 0.0):
+            lo = mid
+            f_lo = f_mid
+        else:
+            hi = mid
+        if hi - lo < tol:
+            break
+    return 0.5 * (lo + hi)
+
+
+@njit(parallel=True, cache=True)
+def _irr_newton_batch(cf_matrix: np.ndarray, guess: float = 0.08) -> np.ndarray:
+    """
+    逐行求解现金流矩阵的 IRR
+
+    各行相互独立, 以 prange 在多核间并行; 敏感性分析等场景中各行 IRR 相近,
+    以基准情景 IRR 作为 guess 时 Newton 迭代通常数步即收敛。
+
+    Args:
+        cf_matrix: 形状为 (n, 年数) 的净现金流矩阵
+        guess: 初始猜测值
+
+    Returns:
+        各行 IRR (小数形式)，无解时为 NaN
+    """
+    n = cf_matrix.shape[0]
+    out = np.empty(n)
+    for i in prange(n):
+        out[i] = _irr_newton(cf_matrix[i], guess)
+    return out
+
+
+# 现金流表列顺序 (与 _compute_cashflow_arrays 输出列一一对应)
+CASHFLOW_COLUMNS = (
+    'Charge_Cost', 'Discharge_Revenue', 'Lease_Revenue', 'Ancillary_Revenue',
+    'Revenue_Inc', 'Revenue_Exc', 'Output_VAT', 'OM_Cost', 'VAT_Payable',
+    'Surtax', 'Battery_Replacement', 'Depreciation', 'Profit_Total', 'Income_Tax',
+    'Net_CF_Pre', 'Net_CF_After',
+)
+_N_CASHFLOW_COLUMNS = len(CASHFLOW_COLUMNS)
+
+# 现金流表各列位置 (列数与 CASHFLOW_COLUMNS 不一致时导入即报错)
+(
+    _COL_CHARGE_COST, _COL_DISCHARGE_REVENUE, _COL_LEASE_REVENUE, _COL_ANCILLARY_REVENUE,
+    _COL_REVENUE_INC, _COL_REVENUE_EXC, _COL_OUTPUT_VAT, _COL_OM_COST, _COL_VAT_PAYABLE,
+    _COL_SURTAX, _COL_BATTERY_REPLACEMENT, _COL_DEPRECIATION, _COL_PROFIT_TOTAL, _COL_INCOME_TAX,
+    _COL_NET_CF_PRE, _COL_NET_CF_AFTER,
+) = range(_N_CASHFLOW_COLUMNS)
+
+# 现金流内核参数顺序 (与 _compute_cashflow_arrays 的参数一一对应);
+# 批量计算时各情景的内核参数按此顺序打包为一行 float64
+_KERNEL_ARG_NAMES = (
+    'n_years', 'discharge_revenue', 'charge_cost', 'lease_revenue', 'ancillary_revenue',
+    'vat_rate', 'om_cost', 'deductible_init', 'battery_life', 'battery_dep',
+    'non_battery_years', 'non_battery_dep', 'replacement_cost', 'replacement_mode_code',
+    'surtax_rate', 'income_tax_rate',
+)
+_N_KERNEL_ARGS = len(_KERNEL_ARG_NAMES)
+
+# 内核参数各项位置
+(
+    _KARG_N_YEARS, _KARG_DISCHARGE_REV, _KARG_CHARGE_COST, _KARG_LEASE_REV, _KARG_ANCILLARY_REV,
+    _KARG_VAT_RATE, _KARG_OM_COST, _KARG_DEDUCTIBLE, _KARG_BATTERY_LIFE, _KARG_BATTERY_DEP,
+    _KARG_NON_BATTERY_YEARS, _KARG_NON_BATTERY_DEP, _KARG_REPLACEMENT_COST, _KARG_REPLACEMENT_MODE,
+    _KARG_SURTAX_RATE, _KARG_INCOME_TAX_RATE,
+) = range(_N_KERNEL_ARGS)
+
+# 内核参数中由 StorageProject._build_operating_flows 给出的部分 (按其返回顺序)
+_OPERATING_KERNEL_ARGS = slice(_KARG_DISCHARGE_REV, _KARG_OM_COST + 1)
+
+
+@njit(cache=True, fastmath=True)
+def _compute_cashflow_arrays(
+    n_years: int,
+    discharge_revenue: float,
+    charge_cost: float,
+    lease_revenue: float,
+    ancillary_revenue: float,
+    vat_rate: float,
+    om_cost: float,
+    deductible_init: float,
+    battery_life: int,
+    battery_dep: float,
+    non_battery_years: int,
+    non_battery_dep: float,
+    replacement_cost: float,
+    replacement_mode_code: int,
+    surtax_rate: float,
+    income_tax_rate: float,
+) -> np.ndarray:
+    """
+    运营期逐年现金流内核
+
+    仅接收标量参数, 收益模式等分支由调用方预先解析, 电池更换处理方式以
+    StorageConstants.REPLACEMENT_MODE_CODES 的整数编码传入 (0=费用化, 1=资本化);
+    增值税抵扣池结转、电池更换、折旧、所得税在同一次逐年循环中完成。
+    末年回收的余值和流动资金不在内核中处理, 由调用方加到最后一年净现金流上。
+
+    Returns:
+        形状为 (n_years, len(CASHFLOW_COLUMNS)) 的数组, 列顺序同 CASHFLOW_COLUMNS
+    """
+    out = np.empty((n_years, _N_CASHFLOW_COLUMNS))
+    rev_inc = discharge_revenue + lease_revenue + ancillary_revenue
+    rev_exc = rev_inc / (1.0 + vat_rate)
+    output_vat = rev_inc - rev_exc
+    pool = max(deductible_init, 0.0)
+
+    for i in range(n_years):
+        op_year = i + 1
+
+        # 增值税抵扣池逻辑: 当年抵扣额 = min(剩余抵扣额, 销项税)
+        used = min(pool, output_vat)
+        pool -= used
+        vat_pay = output_vat - used
+        surtax = vat_pay * surtax_rate
+
+        # 在电池寿命到期年份产生更换费用
+        battery_replacement = 0.0
+        if op_year % battery_life == 0 and op_year < n_years:
+            battery_replacement = replacement_cost
+
+        # 折旧: 电池按电池寿命, 非电池按15年
+        depreciation = 0.0
+        if op_year <= battery_life:
+            depreciation += battery_dep
+        if op_year <= non_battery_years:
+            depreciation += non_battery_dep
+
+        # 利润总额 (资本化模式下电池更换不作为当期费用)
+        profit = rev_exc - charge_cost - om_cost - surtax - depreciation
+        if replacement_mode_code == 0:
+            profit -= battery_replacement
+
+        # 三免三减半政策
+        if op_year <= 3:
+            tax_rate = 0.0
+        elif op_year <= 6:
+            tax_rate = income_tax_rate * 0.5
+        else:
+            tax_rate = income_tax_rate
+        income_tax = max(0.0, profit * tax_rate)
+
+        # 现金流入 = 放电收入 + 租赁收入 + 辅助服务收入
+        net_cf_pre = rev_inc - (charge_cost + om_cost + surtax + battery_replacement)
+
+        row = out[i]
+        row[_COL_CHARGE_COST] = charge_cost
+        row[_COL_DISCHARGE_REVENUE] = discharge_revenue
+        row[_COL_LEASE_REVENUE] = lease_revenue
+        row[_COL_ANCILLARY_REVENUE] = ancillary_revenue
+        row[_COL_REVENUE_INC] = rev_inc
+        row[_COL_REVENUE_EXC] = rev_exc
+        row[_COL_OUTPUT_VAT] = output_vat
+        row[_COL_OM_COST] = om_cost
+        row[_COL_VAT_PAYABLE] = vat_pay
+        row[_COL_SURTAX] = surtax
+        row[_COL_BATTERY_REPLACEMENT] = battery_replacement
+        row[_COL_DEPRECIATION] = depreciation
+        row[_COL_PROFIT_TOTAL] = 0.0
+        row[_COL_INCOME_TAX] = income_tax
+        row[_COL_NET_CF_PRE] = net_cf_pre
+        row[_COL_NET_CF_AFTER] = net_cf_pre - income_tax
+
+    return out
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_cashflow_arrays(*kernel_args) -> np.ndarray:
+    """
+    带缓存的 _compute_cashflow_arrays
+
+    内核参数均为可哈希标量, 敏感性分析等场景中重复出现的参数组合直接命中缓存。
+    返回数组被置为只读, 防止调用方修改缓存内容。
+    """
+    flows = _compute_cashflow_arrays(*kernel_args)
+    flows.flags.writeable = False
+    return flows
+
+
+@njit(cache=True)
+def _payback_period(cf: np.ndarray) -> float:
+    """
+    静态投资回收期 (年)
+
+    取累计净现金流首次非负的年份, 并按上一年末未收回额占当年净现金流的比例插值。
+
+    Returns:
+        投资回收期，运营期内无法收回时返回 NaN
+    """
+    cumsum = 0.0
+    for i in range(cf.shape[0]):
+        prev = cumsum
+        cumsum += cf[i]
+        if cumsum >= 0.0:
+            if i == 0:
+                return 1.0
+            return i - 1 + abs(prev) / cf[i]
+    return np.nan
+
+
+@njit(cache=True)
+def _net_cash_flows(
+    a: np.ndarray,
+    initial_outflow: float,
+    terminal_inflow: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    由一行打包的内核参数生成含建设期的全周期净现金流
+
+    Args:
+        a: 长度为 _N_KERNEL_ARGS 的数组, 各项顺序同 _KERNEL_ARG_NAMES
+        initial_outflow: 建设期现金流出
+        terminal_inflow: 末年回收的余值和流动资金
+
+    Returns:
+        (税前净现金流, 税后净现金流)，长度均为运营期年数 + 1
+    """
+    flows = _compute_cashflow_arrays(
+        int(a[_KARG_N_YEARS]),
+        a[_KARG_DISCHARGE_REV], a[_KARG_CHARGE_COST], a[_KARG_LEASE_REV], a[_KARG_ANCILLARY_REV],
+        a[_KARG_VAT_RATE], a[_KARG_OM_COST], a[_KARG_DEDUCTIBLE],
+        int(a[_KARG_BATTERY_LIFE]), a[_KARG_BATTERY_DEP],
+        int(a[_KARG_NON_BATTERY_YEARS]), a[_KARG_NON_BATTERY_DEP],
+        a[_KARG_REPLACEMENT_COST], int(a[_KARG_REPLACEMENT_MODE]),
+        a[_KARG_SURTAX_RATE], a[_KARG_INCOME_TAX_RATE],
+    )
+    n_rows = flows.shape[0] + 1
+    cf_pre = np.empty(n_rows)
+    cf_after = np.empty(n_rows)
+    cf_pre[0] = initial_outflow
+    cf_after[0] = initial_outflow
+    cf_pre[1:] = flows[:, _COL_NET_CF_PRE]
+    cf_after[1:] = flows[:, _COL_NET_CF_AFTER]
+    cf_pre[-1] += terminal_inflow
+    cf_after[-1] += terminal_inflow
+    return cf_pre, cf_after
+
+
+@njit(parallel=True, cache=True)
+def _batch_net_cash_flows(
+    kernel_args: np.ndarray,
+    initial_outflows: np.ndarray,
+    terminal_inflows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量生成全周期净现金流矩阵
+
+    Args:
+        kernel_args: 形状为 (n, _N_KERNEL_ARGS) 的数组, 每行各项顺序同 _KERNEL_ARG_NAMES
+        initial_outflows: 各情景建设期现金流出
+        terminal_inflows: 各情景末年回收的余值和流动资金
+
+    Returns:
+        (税前净现金流矩阵, 税后净现金流矩阵)，形状均为 (n, 运营期年数 + 1)
+    """
+    n = kernel_args.shape[0]
+    n_rows = int(kernel_args[0, _KARG_N_YEARS]) + 1 if n > 0 else 0
+    cf_pre = np.empty((n, n_rows))
+    cf_after = np.empty((n, n_rows))
+    for i in prange(n):
+        cf_pre[i], cf_after[i] = _net_cash_flows(kernel_args[i], initial_outflows[i], terminal_inflows[i])
+    return cf_pre, cf_after
+
+
+@njit(parallel=True, cache=True)
+def _batch_eval(
+    kernel_args: np.ndarray,
+    initial_outflows: np.ndarray,
+    terminal_inflows: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    批量计算全投资IRR与投资回收期
+
+    各情景相互独立, 以 prange 在多核间并行 (numba 执行期间不持有 GIL)。
+
+    Args:
+        kernel_args: 形状为 (n, _N_KERNEL_ARGS) 的数组, 每行各项顺序同 _KERNEL_ARG_NAMES
+        initial_outflows: 各情景建设期现金流出
+        terminal_inflows: 各情景末年回收的余值和流动资金
+
+    Returns:
+        (IRR税前, IRR税后, 投资回收期)，IRR 为小数形式, 无法收回投资时回收期为 NaN
+    """
+    n = kernel_args.shape[0]
+    irr_pre = np.empty(n)
+    irr_after = np.empty(n)
+    payback = np.empty(n)
+    for i in prange(n):
+        cf_pre, cf_after = _net_cash_flows(kernel_args[i], initial_outflows[i], terminal_inflows[i])
+        irr_pre[i] = _irr_newton(cf_pre)
+        irr_after[i] = _irr_newton(cf_after)
+        payback[i] = _payback_period(cf_after)
+    return irr_pre, irr_after, payback
+
+
+# ==============================================================================
+# 报表导出
+# ==============================================================================
+
+def _csv_cells(values: Any) -> List[Any]:
+    """
+    将一列数据转换为 csv 单元格值, 输出格式与 pandas.to_csv 一致
+
+    float64 转为 Python float (按 repr 输出), float32 按 str 输出最短表示,
+    NaN 输出为空单元格。
+    """
+    arr = np.asarray(values)
+    if arr.dtype == np.float64:
+        return ['' if v != v else v for v in arr.tolist()]
+    if arr.dtype.kind == 'f':
+        return ['' if v != v else str(v) for v in arr]
+    return arr.tolist()
+
+
+def _open_csv(path: str) -> IO[str]:
+    """以 utf-8-sig 编码打开 CSV 输出文件 (与 pandas.to_csv 一致)"""
+    return open(path, 'w', newline='', encoding='utf-8-sig')
+
+
+def _csv_writer(f: IO[str]) -> Any:
+    """创建 csv.writer (行结束符与 pandas.to_csv 一致)"""
+    return csv.writer(f, quoting=csv.QUOTE_MINIMAL, lineterminator=os.linesep)
+
+
+def _fast_csv_dump(path: str, headers: List[str], columns: List[Any]) -> None:
+    """
+    按列写出 CSV (utf-8-sig 编码, 不含索引)
+
+    直接由 numpy 列数组逐行写出, 不经过 pandas 的逐单元格格式化。
+
+    Args:
+        path: 输出文件名
+        headers: 表头
+        columns: 各列数据, 与 headers 一一对应
+    """
+    with _open_csv(path) as f:
+        writer = _csv_writer(f)
+        writer.writerow(headers)
+        writer.writerows(zip(*(_csv_cells(col) for col in columns)))
+
+
 # ==============================================================================
 # 核心类: 储能项目
 # ==============================================================================
@@ -111,7 +551,7 @@ class StorageProject:
         初始化储能项目
 
         Args:
-            params: 项目参数字典
+            params: 项目参数字典 (只读; 初始化时提取为实例属性, 不复制也不保留该字典)
 
             通用参数:
                 - power_mw: 装机功率 (MW)
@@ -122,6 +562,8 @@ class StorageProject:
                 - loan_rate: 长期贷款利率，默认 0.049
                 - capital_ratio: 资本金比例，默认 0.2
                 - deductible_tax: 可抵扣进项税 (万元)，可选
+                - cashflow_dtype: 现金流表存储精度, 'float64'(默认) 或 'float32'
+                  (大批量情景留存现金流表时可减半内存; 内核与 IRR 计算始终使用 float64)
 
             收益模式选择:
                 - revenue_mode: 'arbitrage'(峰谷套利), 'capacity'(容量租赁),
@@ -148,27 +590,35 @@ class StorageProject:
         Raises:
             InputValidationError: 参数验证失败
         """
-        self.p = params.copy()
-        self._validate_and_init_params()
+        self._validate_and_init_params(params)
         self.df: Optional[pd.DataFrame] = None
+        # calculate_cash_flow 生成时的全周期税前净现金流 (float64), 供敏感性分析逐点求解 IRR;
+        # 不反映之后对 self.df 的修改, 指标与报表均以 self.df 当前内容为准
+        self._net_cf_pre: Optional[np.ndarray] = None
         self.total_invest: float = 0.0
         self.const_interest: float = 0.0
 
-    def _validate_and_init_params(self) -> None:
+        # 折旧计划 (calculate_cash_flow 中生成, 供报表输出复用)
+        self._fixed_asset_value: float = 0.0
+        self._battery_depreciation_per_year: float = 0.0
+        self._non_battery_depreciation_per_year: float = 0.0
+        self._depreciation_arr: Optional[np.ndarray] = None
+
+    def _validate_and_init_params(self, p: Dict[str, Any]) -> None:
         """参数校验与标准化"""
         # 验证通用必需参数
         required_keys = ['power_mw', 'capacity_mwh', 'static_invest']
-        missing_keys = [k for k in required_keys if k not in self.p]
+        missing_keys = [k for k in required_keys if k not in p]
         if missing_keys:
             raise InputValidationError(f"缺少必需参数: {missing_keys}")
 
         # 获取并验证通用参数
-        self.power_mw = float(self.p.get('power_mw', 0))
-        self.capacity_mwh = float(self.p.get('capacity_mwh', 0))
-        self.efficiency = float(self.p.get('efficiency', 0.85))
-        self.static_invest = float(self.p.get('static_invest', 0))
-        self.loan_rate = float(self.p.get('loan_rate', 0.049))
-        self.capital_ratio = float(self.p.get('capital_ratio', 0.2))
+        self.power_mw = float(p.get('power_mw', 0))
+        self.capacity_mwh = float(p.get('capacity_mwh', 0))
+        self.efficiency = float(p.get('efficiency', 0.85))
+        self.static_invest = float(p.get('static_invest', 0))
+        self.loan_rate = float(p.get('loan_rate', 0.049))
+        self.capital_ratio = float(p.get('capital_ratio', 0.2))
 
         # 数值范围验证
         if self.power_mw <= 0:
@@ -182,42 +632,48 @@ class StorageProject:
         if not 0 < self.capital_ratio <= 1:
             raise InputValidationError("资本金比例必须在 (0, 1] 范围内")
 
+        # 现金流表存储精度
+        cashflow_dtype = p.get('cashflow_dtype', 'float64')
+        if cashflow_dtype not in ('float64', 'float32'):
+            raise InputValidationError("现金流表精度必须为 'float64' 或 'float32'")
+        self.cashflow_dtype = np.dtype(cashflow_dtype)
+
         # 预计算贷款本金
         self.loan_principal = self.static_invest * (1 - self.capital_ratio)
 
         # 电池资产占比 (用于分离折旧计算)
         # 依据 DL/T 2919-2025 E.1.4: 电池部分按寿命折旧, 其余部分按15-20年折旧
-        self.battery_asset_ratio = float(self.p.get('battery_asset_ratio', StorageConstants.BATTERY_ASSET_RATIO))
+        self.battery_asset_ratio = float(p.get('battery_asset_ratio', StorageConstants.BATTERY_ASSET_RATIO))
         if not 0 < self.battery_asset_ratio <= 1:
             raise InputValidationError("电池资产比例必须在 (0, 1] 范围内")
 
         # 获取收益模式
-        self.revenue_mode = self.p.get('revenue_mode', StorageConstants.MODE_ARBITRAGE)
+        self.revenue_mode = p.get('revenue_mode', StorageConstants.MODE_ARBITRAGE)
 
         # 验证特定模式参数
         if self.revenue_mode == StorageConstants.MODE_ARBITRAGE:
             # 峰谷套利模式参数
-            self.cycles_per_year = int(self.p.get('cycles_per_year', 330))
-            self.charge_price = float(self.p.get('charge_price', 0.3))
-            self.discharge_price = float(self.p.get('discharge_price', 0.9))
-            logger.info(f"模式: 峰谷套利, 循环{self.cycles_per_year}次/年, "
-                       f"价差{self.discharge_price - self.charge_price:.2f}元/kWh")
+            self.cycles_per_year = int(p.get('cycles_per_year', 330))
+            self.charge_price = float(p.get('charge_price', 0.3))
+            self.discharge_price = float(p.get('discharge_price', 0.9))
+            logger.debug("模式: 峰谷套利, 循环%d次/年, 价差%.2f元/kWh",
+                         self.cycles_per_year, self.discharge_price - self.charge_price)
 
         elif self.revenue_mode == StorageConstants.MODE_CAPACITY:
             # 容量租赁模式参数
-            if 'lease_capacity' not in self.p or 'lease_price' not in self.p:
+            if 'lease_capacity' not in p or 'lease_price' not in p:
                 raise InputValidationError("容量租赁模式需要参数: lease_capacity, lease_price")
-            self.lease_capacity = float(self.p['lease_capacity'])
-            self.lease_price = float(self.p['lease_price'])
-            logger.info(f"模式: 容量租赁, 租赁{self.lease_capacity}MW, "
-                       f"价格{self.lease_price}元/MW/年")
+            self.lease_capacity = float(p['lease_capacity'])
+            self.lease_price = float(p['lease_price'])
+            logger.debug("模式: 容量租赁, 租赁%sMW, 价格%s元/MW/年",
+                         self.lease_capacity, self.lease_price)
 
         elif self.revenue_mode == StorageConstants.MODE_ANCILLARY:
             # 辅助服务模式参数
-            if 'ancillary_type' not in self.p or 'ancillary_revenue' not in self.p:
+            if 'ancillary_type' not in p or 'ancillary_revenue' not in p:
                 raise InputValidationError("辅助服务模式需要参数: ancillary_type, ancillary_revenue")
-            self.ancillary_type = self.p['ancillary_type']
-            self.ancillary_revenue = float(self.p['ancillary_revenue'])
+            self.ancillary_type = p['ancillary_type']
+            self.ancillary_revenue = float(p['ancillary_revenue'])
 
             # 设置电池寿命
             if self.ancillary_type == 'frequency':
@@ -225,44 +681,50 @@ class StorageProject:
             else:
                 self.battery_life = StorageConstants.BATTERY_LIFE_PEAKING
 
-            logger.info(f"模式: 辅助服务-{self.ancillary_type}, "
-                       f"年收入{self.ancillary_revenue}万元, 电池寿命{self.battery_life}年")
+            logger.debug("模式: 辅助服务-%s, 年收入%s万元, 电池寿命%d年",
+                         self.ancillary_type, self.ancillary_revenue, self.battery_life)
 
         elif self.revenue_mode == StorageConstants.MODE_HYBRID:
             # 混合模式需要组合参数
-            self.cycles_per_year = int(self.p.get('cycles_per_year', 330))
-            self.charge_price = float(self.p.get('charge_price', 0.3))
-            self.discharge_price = float(self.p.get('discharge_price', 0.9))
-            self.ancillary_revenue = float(self.p.get('ancillary_revenue', 0))
-            self.battery_life = int(self.p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
-            logger.info(f"模式: 混合模式")
+            self.cycles_per_year = int(p.get('cycles_per_year', 330))
+            self.charge_price = float(p.get('charge_price', 0.3))
+            self.discharge_price = float(p.get('discharge_price', 0.9))
+            self.ancillary_revenue = float(p.get('ancillary_revenue', 0))
+            self.battery_life = int(p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
+            logger.debug("模式: 混合模式")
 
         # 电池更换策略
         # 先设置默认值
-        self.battery_life = int(self.p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
+        self.battery_life = int(p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
 
-        if 'battery_life' in self.p:
-            self.battery_life = int(self.p['battery_life'])
+        if 'battery_life' in p:
+            self.battery_life = int(p['battery_life'])
         elif self.revenue_mode == StorageConstants.MODE_ANCILLARY:
             # 辅助服务模式根据类型设置电池寿命
-            self.ancillary_type = self.p.get('ancillary_type', 'peaking')
+            self.ancillary_type = p.get('ancillary_type', 'peaking')
             if self.ancillary_type == 'frequency':
                 self.battery_life = StorageConstants.BATTERY_LIFE_FREQUENCY
             else:
                 self.battery_life = StorageConstants.BATTERY_LIFE_PEAKING
         elif self.revenue_mode == StorageConstants.MODE_HYBRID:
-            self.battery_life = int(self.p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
+            self.battery_life = int(p.get('battery_life', StorageConstants.BATTERY_LIFE_PEAKING))
 
-        self.replacement_mode = self.p.get('replacement_mode', StorageConstants.REPLACEMENT_EXPENSE)
+        self.replacement_mode = p.get('replacement_mode', StorageConstants.REPLACEMENT_EXPENSE)
 
         # 电池更换成本（可选，默认按静态投资的70%估算）
-        if 'replacement_cost' in self.p:
-            self.replacement_cost = float(self.p['replacement_cost'])
+        if 'replacement_cost' in p:
+            self.replacement_cost = float(p['replacement_cost'])
         else:
             self.replacement_cost = self.static_invest * 0.7
 
-        logger.info(f"项目参数验证通过: 功率={self.power_mw}MW, 容量={self.capacity_mwh}MWh, "
-                   f"投资={self.static_invest}万元, 电池寿命={self.battery_life}年")
+        # 增值税抵扣池初始值 (可选，默认按静态投资所含 13% 进项税估算)
+        self._deductible_tax = float(p.get(
+            'deductible_tax',
+            self.static_invest / (1 + StorageConstants.VAT_ELECTRICITY) * StorageConstants.VAT_ELECTRICITY
+        ))
+
+        logger.debug("项目参数验证通过: 功率=%sMW, 容量=%sMWh, 投资=%s万元, 电池寿命=%d年",
+                     self.power_mw, self.capacity_mwh, self.static_invest, self.battery_life)
 
     def _calc_construction_interest(self) -> float:
         """
@@ -274,12 +736,12 @@ class StorageProject:
         interest = (self.loan_principal / 2) * self.loan_rate
         return interest
 
-    def _get_om_rate(self, year_idx: int) -> float:
+    def _get_om_rate(self) -> float:
         """
         获取运维费率
 
         依据边界表: 锂电池储能按 30元/kW 或 0.05元/kWh 估算
-        取两者中的较大值
+        取两者中的较大值; 运营期内各年相同
         """
         om_by_power = self.power_mw * 1000 * StorageConstants.OM_FEE_PER_KW / 10000  # 万元
         # 估算年发电量用于计算按电量的运维费
@@ -288,201 +750,180 @@ class StorageProject:
         # annual_discharge (MWh) × 1000 (kWh/MWh) × 0.05 (元/kWh) / 10000 (元/万元)
         om_by_energy = annual_discharge * 1000 * StorageConstants.OM_FEE_PER_KWH / 10000  # 万元
 
-        return max(om_by_power, om_by_energy)
+        return np.maximum(om_by_power, om_by_energy)
 
-    def calculate_cash_flow(self) -> pd.DataFrame:
+    def _arbitrage_flows(self, cycles_per_year, discharge_price, charge_price):
         """
-        核心引擎: 生成运营期现金流表
+        峰谷套利年放电收入与充电成本 (万元)
 
-        依据 DLT2919-2025 第4章 财务分析方法
+        依据 DLT2919-2025 公式 4.2.7-1:
+        年收入 = 循环次数 × (η × 容量 × 放电电价 - 容量 × 充电电价)
+        拆分为充电成本和放电收入（更清晰的现金流）; 参数可为标量或 ndarray
+        """
+        # 容量 (MWh) × 电价 (元/kWh) 经 MWH_PRICE_TO_WAN 换算为万元, 换算系数预先乘入单次循环电量
+        energy_per_cycle = self.capacity_mwh * StorageConstants.MWH_PRICE_TO_WAN
+        discharge_revenue = cycles_per_year * self.efficiency * energy_per_cycle * discharge_price  # 万元
+        charge_cost = cycles_per_year * energy_per_cycle * charge_price  # 万元
+        return discharge_revenue, charge_cost
+
+    def _build_capex_schedule(self) -> Tuple[float, float]:
+        """
+        建设期投资与折旧计划
+
+        与运营参数 (电价、循环次数等) 无关; 结果保存在实例上, 供报表输出复用。
 
         Returns:
-            包含完整现金流数据的DataFrame
+            (建设期现金流出, 末年回收的余值和流动资金)
         """
-        try:
-            # --- A. 建设期计算 ---
-            const_interest = self._calc_construction_interest()
+        # --- A. 建设期计算 ---
+        const_interest = self._calc_construction_interest()
 
-            # 流动资金 (按边界表，储能项目流动资金较小)
-            working_capital = self.static_invest * 0.01
+        # 流动资金 (按边界表，储能项目流动资金较小)
+        working_capital = self.static_invest * 0.01
 
-            # 动态总投资
-            total_invest = self.static_invest + const_interest + working_capital
+        # 动态总投资
+        total_invest = self.static_invest + const_interest + working_capital
 
-            # 增值税抵扣池初始化
-            deductible_tax = self.p.get(
-                'deductible_tax',
-                self.static_invest / (1 + StorageConstants.VAT_ELECTRICITY) * StorageConstants.VAT_ELECTRICITY
-            )
+        # --- B. 折旧参数 ---
+        fixed_asset_value = self.static_invest + const_interest - self._deductible_tax
 
-            # --- B. 初始化现金流表 ---
-            years = np.arange(1, StorageConstants.OPERATION_PERIOD + 2)  # 1..21
-            df = pd.DataFrame(index=years)
-
-            cols = [
-                'Charge_Cost', 'Discharge_Revenue', 'Lease_Revenue', 'Ancillary_Revenue',
-                'Revenue_Inc', 'Revenue_Exc', 'Output_VAT', 'OM_Cost', 'VAT_Payable',
-                'Surtax', 'Battery_Replacement', 'Depreciation', 'Profit_Total', 'Income_Tax',
-                'Net_CF_Pre', 'Net_CF_After'
-            ]
-            for c in cols:
-                df[c] = 0.0
-
-            # 第1年 (建设期) 现金流出
-            df.loc[1, 'Net_CF_Pre'] = -(self.static_invest + working_capital)
-            df.loc[1, 'Net_CF_After'] = -(self.static_invest + working_capital)
-
-            # --- C. 运营期逐年迭代 ---
-            current_deductible = deductible_tax
-            fixed_asset_value = self.static_invest + const_interest - deductible_tax
-
-            # 分离电池资产与非电池资产折旧 (依据 DL/T 2919-2025 E.1.4)
-            battery_asset_value = fixed_asset_value * self.battery_asset_ratio
-            non_battery_asset_value = fixed_asset_value * (1 - self.battery_asset_ratio)
-
-            # 电池资产按电池寿命折旧
-            battery_depreciation_per_year = (
-                battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / self.battery_life
-            )
-            # 非电池资产按15-20年折旧
-            non_battery_depreciation_per_year = (
-                non_battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / StorageConstants.DEPRECIATION_YEARS_NON_BATTERY
+        # 分离电池资产与非电池资产折旧 (依据 DL/T 2919-2025 E.1.4)
+        battery_asset_value = fixed_asset_value * self.battery_asset_ratio
+        non_battery_asset_value = fixed_asset_value * (1 - self.battery_asset_ratio)
+
+        # 电池资产按电池寿命折旧
+        battery_depreciation_per_year = (
+            battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / self.battery_life
+        )
+        # 非电池资产按15-20年折旧
+        non_battery_depreciation_per_year = (
+            non_battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / StorageConstants.DEPRECIATION_YEARS_NON_BATTERY
+        )
+
+        self.total_invest = total_invest
+        self.const_interest = const_interest
+        self._fixed_asset_value = fixed_asset_value
+        self._battery_depreciation_per_year = battery_depreciation_per_year
+        self._non_battery_depreciation_per_year = non_battery_depreciation_per_year
+
+        # 最后一年回收余值和流动资金
+        residual = self.static_invest * StorageConstants.RESIDUAL_RATIO
+
+        return -(self.static_invest + working_capital), residual + working_capital
+
+    def _build_operating_flows(self) -> Tuple[float, float, float, float, float, float]:
+        """
+        运营期年度收支口径
+
+        收益模式分支在此解析为标量, 内核中不再判断。
+
+        Returns:
+            (放电收入, 充电成本, 租赁收入, 辅助服务收入, 增值税率, 运维费)，金额单位万元
+        """
+        # --- C. 收入口径 ---
+        charge_cost = 0.0
+        discharge_revenue = 0.0
+        lease_revenue = 0.0
+        ancillary_revenue = 0.0
+
+        if self.revenue_mode == StorageConstants.MODE_ARBITRAGE or self.revenue_mode == StorageConstants.MODE_HYBRID:
+            discharge_revenue, charge_cost = self._arbitrage_flows(
+                self.cycles_per_year, self.discharge_price, self.charge_price
             )
 
-            for y in range(2, StorageConstants.OPERATION_PERIOD + 2):
-                op_year = y - 1
-
-                # ========== 收入计算 ==========
-                charge_cost = 0.0
-                discharge_revenue = 0.0
-                lease_revenue = 0.0
-                ancillary_revenue = 0.0
-
-                if self.revenue_mode == StorageConstants.MODE_ARBITRAGE or self.revenue_mode == StorageConstants.MODE_HYBRID:
-                    # 峰谷套利收入 (依据 DLT2919-2025 公式 4.2.7-1)
-                    # 年收入 = 循环次数 × (η × 容量 × 放电电价 - 容量 × 充电电价)
-                    annual_revenue = self.cycles_per_year * (
-                        self.efficiency * self.capacity_mwh * self.discharge_price * 10000
-                        - self.capacity_mwh * self.charge_price * 10000
-                    ) / 10000  # 万元
-
-                    # 拆分为充电成本和放电收入（更清晰的现金流）
-                    discharge_revenue = self.cycles_per_year * self.efficiency * self.capacity_mwh * self.discharge_price * 10000 / 10000  # 万元
-                    charge_cost = self.cycles_per_year * self.capacity_mwh * self.charge_price * 10000 / 10000  # 万元
-
-                    # 混合模式还要加上辅助服务收入
-                    if self.revenue_mode == StorageConstants.MODE_HYBRID:
-                        ancillary_revenue = self.ancillary_revenue
-
-                elif self.revenue_mode == StorageConstants.MODE_CAPACITY:
-                    # 容量租赁收入 (依据 DLT2919-2025 公式 4.2.8-1)
-                    # 收入 = 租赁容量 × 租赁价格
-                    lease_revenue = self.lease_capacity * self.lease_price
-
-                elif self.revenue_mode == StorageConstants.MODE_ANCILLARY:
-                    # 辅助服务收入
-                    ancillary_revenue = self.ancillary_revenue
-
-                # 计算含税和不含税收入
-                if self.revenue_mode == StorageConstants.MODE_CAPACITY:
-                    # 容量租赁增值税率 6%
-                    rev_inc = lease_revenue
-                    rev_exc = lease_revenue / (1 + StorageConstants.VAT_CAPACITY)
-                    output_vat = rev_inc - rev_exc
-                else:
-                    # 电力销售/辅助服务增值税率 13%
-                    rev_inc = discharge_revenue + ancillary_revenue
-                    rev_exc = rev_inc / (1 + StorageConstants.VAT_ELECTRICITY)
-                    output_vat = rev_inc - rev_exc
-
-                df.loc[y, 'Charge_Cost'] = charge_cost
-                df.loc[y, 'Discharge_Revenue'] = discharge_revenue
-                df.loc[y, 'Lease_Revenue'] = lease_revenue
-                df.loc[y, 'Ancillary_Revenue'] = ancillary_revenue
-                df.loc[y, 'Revenue_Inc'] = rev_inc
-                df.loc[y, 'Revenue_Exc'] = rev_exc
-                df.loc[y, 'Output_VAT'] = output_vat
-
-                # ========== 成本计算 ==========
-                # 运维费
-                om_cost = self._get_om_rate(op_year)
-                df.loc[y, 'OM_Cost'] = om_cost
-
-                # ========== 税务计算 ==========
-                # 增值税抵扣池逻辑
-                if current_deductible > 0:
-                    if current_deductible >= output_vat:
-                        current_deductible -= output_vat
-                        vat_pay = 0
-                    else:
-                        vat_pay = output_vat - current_deductible
-                        current_deductible = 0
-                else:
-                    vat_pay = output_vat
-
-                df.loc[y, 'VAT_Payable'] = vat_pay
-                surtax = vat_pay * StorageConstants.SURTAX_RATE
-                df.loc[y, 'Surtax'] = surtax
-
-                # ========== 电池更换费用 ==========
-                # 在电池寿命到期年份产生更换费用
-                battery_replacement = 0.0
-                if op_year % self.battery_life == 0 and op_year < StorageConstants.OPERATION_PERIOD:
-                    battery_replacement = self.replacement_cost
-                df.loc[y, 'Battery_Replacement'] = battery_replacement
-
-                # ========== 折旧 (分离电池与非电池资产) ==========
-                # 电池折旧: 按电池寿命 (调峰10年, 调频4年)
-                battery_depreciation = battery_depreciation_per_year if op_year <= self.battery_life else 0
-                # 非电池折旧: 按15年折旧
-                non_battery_depreciation = non_battery_depreciation_per_year if op_year <= StorageConstants.DEPRECIATION_YEARS_NON_BATTERY else 0
-                depreciation = battery_depreciation + non_battery_depreciation
-                df.loc[y, 'Depreciation'] = depreciation
-
-                # ========== 利润与所得税 ==========
-                # 利润总额 = 收入 - 充电成本 - 运维费 - 附加税 - 折旧 - 电池更换(费用化)
-                if self.replacement_mode == StorageConstants.REPLACEMENT_EXPENSE:
-                    profit = rev_exc - charge_cost - om_cost - surtax - depreciation - battery_replacement
-                else:
-                    # 资本化模式下，电池更换不作为当期费用
-                    profit = rev_exc - charge_cost - om_cost - surtax - depreciation
-
-                # 三免三减半政策 (储能项目可能享受)
-                if op_year <= 3:
-                    tax_rate = 0.0
-                elif op_year <= 6:
-                    tax_rate = StorageConstants.INCOME_TAX_RATE * 0.5
-                else:
-                    tax_rate = StorageConstants.INCOME_TAX_RATE
-
-                income_tax = max(0.0, profit * tax_rate)
-                df.loc[y, 'Income_Tax'] = income_tax
-
-                # ========== 现金流合成 ==========
-                # 现金流入 = 放电收入 + 租赁收入 + 辅助服务收入
-                inflow = discharge_revenue + lease_revenue + ancillary_revenue
-
-                # 最后一年回收余值和流动资金
-                if y == StorageConstants.OPERATION_PERIOD + 1:
-                    residual = self.static_invest * StorageConstants.RESIDUAL_RATIO
-                    inflow += residual + working_capital
-
-                # 现金流出 = 充电成本 + 运维费 + 附加税 + 电池更换 + 所得税
-                outflow = charge_cost + om_cost + surtax + battery_replacement + income_tax
-
-                df.loc[y, 'Net_CF_Pre'] = inflow - (charge_cost + om_cost + surtax + battery_replacement)
-                df.loc[y, 'Net_CF_After'] = inflow - outflow
+            # 混合模式还要加上辅助服务收入
+            if self.revenue_mode == StorageConstants.MODE_HYBRID:
+                ancillary_revenue = self.ancillary_revenue
+
+        elif self.revenue_mode == StorageConstants.MODE_CAPACITY:
+            # 容量租赁收入 (依据 DLT2919-2025 公式 4.2.8-1)
+            # 收入 = 租赁容量 × 租赁价格
+            lease_revenue = self.lease_capacity * self.lease_price
+
+        elif self.revenue_mode == StorageConstants.MODE_ANCILLARY:
+            # 辅助服务收入
+            ancillary_revenue = self.ancillary_revenue
+
+        # 容量租赁增值税率 6%, 电力销售/辅助服务增值税率 13%
+        if self.revenue_mode == StorageConstants.MODE_CAPACITY:
+            vat_rate = StorageConstants.VAT_CAPACITY
+        else:
+            vat_rate = StorageConstants.VAT_ELECTRICITY
+
+        # 运维费 (各年相同, 只计算一次)
+        om_cost = self._get_om_rate()
+
+        return discharge_revenue, charge_cost, lease_revenue, ancillary_revenue, vat_rate, om_cost
+
+    def _prepare_kernel_inputs(self) -> Tuple[tuple, float, float]:
+        """
+        准备现金流内核输入
+
+        Returns:
+            (_compute_cashflow_arrays 参数元组, 建设期现金流出, 末年回收的余值和流动资金)
+        """
+        initial_outflow, terminal_inflow = self._build_capex_schedule()
+
+        kernel_args: List[Any] = [0.0] * _N_KERNEL_ARGS
+        kernel_args[_KARG_N_YEARS] = StorageConstants.OPERATION_PERIOD
+        kernel_args[_OPERATING_KERNEL_ARGS] = self._build_operating_flows()
+        kernel_args[_KARG_DEDUCTIBLE] = self._deductible_tax
+        kernel_args[_KARG_BATTERY_LIFE] = self.battery_life
+        kernel_args[_KARG_BATTERY_DEP] = self._battery_depreciation_per_year
+        kernel_args[_KARG_NON_BATTERY_YEARS] = StorageConstants.DEPRECIATION_YEARS_NON_BATTERY
+        kernel_args[_KARG_NON_BATTERY_DEP] = self._non_battery_depreciation_per_year
+        kernel_args[_KARG_REPLACEMENT_COST] = self.replacement_cost
+        # 'expense' 以外的取值均按资本化处理
+        kernel_args[_KARG_REPLACEMENT_MODE] = StorageConstants.REPLACEMENT_MODE_CODES.get(
+            self.replacement_mode, StorageConstants.REPLACEMENT_MODE_CODES[StorageConstants.REPLACEMENT_CAPITALIZE]
+        )
+        kernel_args[_KARG_SURTAX_RATE] = StorageConstants.SURTAX_RATE
+        kernel_args[_KARG_INCOME_TAX_RATE] = StorageConstants.INCOME_TAX_RATE
+        return tuple(kernel_args), initial_outflow, terminal_inflow
+
+    def calculate_cash_flow(self) -> pd.DataFrame:
+        """
+        核心引擎: 生成运营期现金流表
+
+        依据 DLT2919-2025 第4章 财务分析方法
+
+        Returns:
+            包含完整现金流数据的DataFrame
+        """
+        try:
+            kernel_args, initial_outflow, terminal_inflow = self._prepare_kernel_inputs()
+
+            # --- D. 运营期现金流内核 ---
+            flows = _cached_cashflow_arrays(*kernel_args)
+
+            # --- E. 一次性组装现金流表 ---
+            # 第1年 (建设期) 仅有投资现金流出, 其余科目为0; 拼接后整表为单一 float64 块, 无需逐列插入
+            years = np.arange(1, StorageConstants.OPERATION_PERIOD + 2)  # 1..21 (第1年为建设期)
+            net_cf_cols = [_COL_NET_CF_PRE, _COL_NET_CF_AFTER]
+            construction_row = np.zeros((1, _N_CASHFLOW_COLUMNS))
+            construction_row[0, net_cf_cols] = initial_outflow
+            table = np.concatenate((construction_row, flows))
+            table[-1, net_cf_cols] += terminal_inflow  # 最后一年回收余值和流动资金
+            df = pd.DataFrame(
+                table.astype(self.cashflow_dtype, copy=False),
+                index=years, columns=list(CASHFLOW_COLUMNS), copy=False
+            )
 
             self.df = df
-            self.total_invest = total_invest
-            self.const_interest = const_interest
+            self._depreciation_arr = flows[:, _COL_DEPRECIATION]
+            self._net_cf_pre = np.ascontiguousarray(table[:, _COL_NET_CF_PRE])
 
-            logger.info(f"现金流计算完成: 总投资={total_invest:.2f}万元")
+            logger.debug("现金流计算完成: 总投资=%.2f万元", self.total_invest)
             return df
 
         except Exception as e:
             raise CalculationError(f"现金流计算失败: {e}") from e
 
+    @property
+    def _op_df(self) -> pd.DataFrame:
+        """运营期 (第2-21年) 现金流, 每次由 self.df 切片得到, 与调用方对 df 的修改保持一致"""
+        return self.df.iloc[1:]
+
     def get_metrics(self) -> Dict[str, float]:
         """
         计算核心指标
@@ -499,20 +940,17 @@ class StorageProject:
             raise CalculationError("请先运行 calculate_cash_flow()")
 
         try:
-            cf_pre = self.df['Net_CF_Pre'].values
-            cf_after = self.df['Net_CF_After'].values
+            # 以 self.df 当前内容为准 (调用方修改 df 后指标随之更新);
+            # float32 存储时上转为 float64 再求解, float64 存储时直接取视图, 不复制
+            cf_pre = self.df['Net_CF_Pre'].to_numpy(dtype=np.float64, copy=False)
+            cf_after = self.df['Net_CF_After'].to_numpy(dtype=np.float64, copy=False)
 
-            irr_pre = npf.irr(cf_pre) * 100
-            irr_after = npf.irr(cf_after) * 100
+            irr_pre = _irr_newton(cf_pre) * 100
+            irr_after = _irr_newton(cf_after) * 100
 
             # 静态投资回收期计算
-            cumsum = np.cumsum(cf_after)
-            positive_indices = np.where(cumsum >= 0)[0]
-
-            if len(positive_indices) > 0:
-                p_idx = positive_indices[0]
-                payback = p_idx - 1 + abs(cumsum[p_idx - 1]) / cf_after[p_idx] if p_idx > 0 else 1.0
-            else:
+            payback = _payback_period(cf_after)
+            if np.isnan(payback):
                 logger.warning("项目在运营期内无法收回投资")
                 payback = 99.9
 
@@ -527,24 +965,67 @@ class StorageProject:
         except Exception as e:
             raise CalculationError(f"指标计算失败: {e}") from e
 
-    # ==============================================================================
-    # 财务报表输出方法
-    # ==============================================================================
-
-    def export_revenue_tax_table(self, filename: Optional[str] = None) -> pd.DataFrame:
+    @classmethod
+    def batch(cls, params_df: pd.DataFrame) -> pd.DataFrame:
         """
-        导出收入和税金表
+        批量情景评价
+
+        params_df 每行为一个情景的项目参数 (列名同 __init__ 的参数键, NaN 视为未提供)。
+        各行参数逐行校验后, 现金流与指标计算在一个并行内核中完成,
+        不为每个情景构造现金流 DataFrame。
 
         Args:
-            filename: 输出文件名
+            params_df: 情景参数表
+
+        Returns:
+            与 params_df 同索引的指标表, 列同 get_metrics()
+
+        Raises:
+            InputValidationError: 某一情景参数验证失败
+            CalculationError: 计算失败
         """
-        if self.df is None:
-            raise CalculationError("请先运行 calculate_cash_flow()")
+        n = len(params_df)
+        kernel_args = np.empty((n, _N_KERNEL_ARGS))
+        initial_outflows = np.empty(n)
+        terminal_inflows = np.empty(n)
+        total_invest = np.empty(n)
+        const_interest = np.empty(n)
+
+        for i, (label, row) in enumerate(zip(params_df.index, params_df.to_dict('records'))):
+            params = {k: v for k, v in row.items() if not (np.isscalar(v) and pd.isna(v))}
+            try:
+                project = cls(params)
+                kernel_args[i], initial_outflows[i], terminal_inflows[i] = project._prepare_kernel_inputs()
+            except InputValidationError as e:
+                raise InputValidationError(f"情景 {label}: {e}") from e
+            except Exception as e:
+                raise CalculationError(f"情景 {label} 计算失败: {e}") from e
+            total_invest[i] = project.total_invest
+            const_interest[i] = project.const_interest
+
+        try:
+            irr_pre, irr_after, payback = _batch_eval(kernel_args, initial_outflows, terminal_inflows)
+        except Exception as e:
+            raise CalculationError(f"批量评价失败: {e}") from e
+
+        return pd.DataFrame({
+            "总投资": total_invest.round(2),
+            "建设期利息": const_interest.round(2),
+            "全投资IRR(税前)": (irr_pre * 100).round(2),
+            "全投资IRR(税后)": (irr_after * 100).round(2),
+            "投资回收期(年)": np.where(np.isnan(payback), 99.9, payback).round(2),
+        }, index=params_df.index)
 
-        cashflow_df = self.df[self.df.index >= 2].copy()
+    # ==============================================================================
+    # 财务报表输出方法
+    # ==============================================================================
 
-        table = pd.DataFrame({
-            '年份': [f'第{i}年' for i in range(1, StorageConstants.OPERATION_PERIOD + 1)],
+    def _revenue_tax_columns(self) -> Dict[str, Any]:
+        """收入和税金表各列 (表头 -> 列数据)"""
+        cashflow_df = self._op_df
+
+        return {
+            '年份': StorageConstants.YEAR_LABELS,
             '充电量(MWh)': [self.capacity_mwh] * StorageConstants.OPERATION_PERIOD,
             '放电量(MWh)': [self.capacity_mwh * self.efficiency] * StorageConstants.OPERATION_PERIOD,
             '营业收入(含税,万元)': cashflow_df['Revenue_Inc'].values,
@@ -552,17 +1033,11 @@ class StorageProject:
             '增值税(万元)': cashflow_df['Output_VAT'].values,
             '增值税实缴(万元)': cashflow_df['VAT_Payable'].values,
             '附加税(万元)': cashflow_df['Surtax'].values,
-        })
+        }
 
-        if filename:
-            table.to_csv(filename, index=False, encoding='utf-8-sig')
-            logger.info(f"收入和税金表已保存到: {filename}")
-
-        return table
-
-    def export_total_cost_table(self, filename: Optional[str] = None) -> pd.DataFrame:
+    def export_revenue_tax_table(self, filename: Optional[str] = None) -> pd.DataFrame:
         """
-        导出总成本费用估算表
+        导出收入和税金表
 
         Args:
             filename: 输出文件名
@@ -570,46 +1045,36 @@ class StorageProject:
         if self.df is None:
             raise CalculationError("请先运行 calculate_cash_flow()")
 
-        cashflow_df = self.df[self.df.index >= 2].copy()
+        columns = self._revenue_tax_columns()
+        table = pd.DataFrame(columns)
+
+        if filename:
+            _fast_csv_dump(filename, list(columns), list(columns.values()))
+            logger.info("收入和税金表已保存到: %s", filename)
 
-        deductible_tax = self.p.get('deductible_tax', self.static_invest / (1 + StorageConstants.VAT_ELECTRICITY) * StorageConstants.VAT_ELECTRICITY)
-        const_interest = self.const_interest
-        fixed_asset_value = self.static_invest + const_interest - deductible_tax
+        return table
 
-        # 分离电池与非电池资产折旧计算
-        battery_asset_value = fixed_asset_value * self.battery_asset_ratio
-        non_battery_asset_value = fixed_asset_value * (1 - self.battery_asset_ratio)
-        battery_depreciation_per_year = battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / self.battery_life
-        non_battery_depreciation_per_year = non_battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / StorageConstants.DEPRECIATION_YEARS_NON_BATTERY
-
-        # 计算每年的折旧额
-        depreciation_list = []
-        for i in range(1, StorageConstants.OPERATION_PERIOD + 1):
-            battery_dep = battery_depreciation_per_year if i <= self.battery_life else 0
-            non_battery_dep = non_battery_depreciation_per_year if i <= StorageConstants.DEPRECIATION_YEARS_NON_BATTERY else 0
-            depreciation_list.append(battery_dep + non_battery_dep)
-
-        table = pd.DataFrame({
-            '年份': [f'第{i}年' for i in range(1, StorageConstants.OPERATION_PERIOD + 1)],
+    def _total_cost_columns(self) -> Dict[str, Any]:
+        """总成本费用估算表各列 (表头 -> 列数据)"""
+        cashflow_df = self._op_df
+
+        # 每年的折旧额 (分离电池与非电池资产, 由 calculate_cash_flow 生成)
+        depreciation_arr = self._depreciation_arr
+
+        return {
+            '年份': StorageConstants.YEAR_LABELS,
             '运维成本(万元)': cashflow_df['OM_Cost'].values,
             '电池更换费用(万元)': cashflow_df['Battery_Replacement'].values,
-            '折旧费(万元)': depreciation_list,
+            '折旧费(万元)': depreciation_arr,
             '摊销费(万元)': [0.0] * StorageConstants.OPERATION_PERIOD,
             '财务费用(万元)': [0.0] * StorageConstants.OPERATION_PERIOD,
-            '总成本费用(万元)': cashflow_df['OM_Cost'].values + cashflow_df['Battery_Replacement'].values + depreciation_list,
-        })
-
-        table['经营成本(万元)'] = table['运维成本(万元)'] + table['电池更换费用(万元)']
-
-        if filename:
-            table.to_csv(filename, index=False, encoding='utf-8-sig')
-            logger.info(f"总成本费用表已保存到: {filename}")
+            '总成本费用(万元)': cashflow_df['OM_Cost'].values + cashflow_df['Battery_Replacement'].values + depreciation_arr,
+            '经营成本(万元)': cashflow_df['OM_Cost'].values + cashflow_df['Battery_Replacement'].values,
+        }
 
-        return table
-
-    def export_profit_table(self, filename: Optional[str] = None) -> pd.DataFrame:
+    def export_total_cost_table(self, filename: Optional[str] = None) -> pd.DataFrame:
         """
-        导出利润与利润分配表
+        导出总成本费用估算表
 
         Args:
             filename: 输出文件名
@@ -617,50 +1082,47 @@ class StorageProject:
         if self.df is None:
             raise CalculationError("请先运行 calculate_cash_flow()")
 
-        cashflow_df = self.df[self.df.index >= 2].copy()
-
-        deductible_tax = self.p.get('deductible_tax', self.static_invest / (1 + StorageConstants.VAT_ELECTRICITY) * StorageConstants.VAT_ELECTRICITY)
-        const_interest = self.const_interest
-        fixed_asset_value = self.static_invest + const_interest - deductible_tax
-
-        # 分离电池与非电池资产折旧计算
-        battery_asset_value = fixed_asset_value * self.battery_asset_ratio
-        non_battery_asset_value = fixed_asset_value * (1 - self.battery_asset_ratio)
-        battery_depreciation_per_year = battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / self.battery_life
-        non_battery_depreciation_per_year = non_battery_asset_value * StorageConstants.DEPRECIATION_BASE_RATIO / StorageConstants.DEPRECIATION_YEARS_NON_BATTERY
-
-        profit_list = []
-        depreciation_list = []
-        for i in range(1, StorageConstants.OPERATION_PERIOD + 1):
-            battery_dep = battery_depreciation_per_year if i <= self.battery_life else 0
-            non_battery_dep = non_battery_depreciation_per_year if i <= StorageConstants.DEPRECIATION_YEARS_NON_BATTERY else 0
-            depreciation = battery_dep + non_battery_dep
-            depreciation_list.append(depreciation)
-            profit = cashflow_df.loc[i + 1, 'Revenue_Exc'] - cashflow_df.loc[i + 1, 'Charge_Cost'] - cashflow_df.loc[i + 1, 'OM_Cost'] - cashflow_df.loc[i + 1, 'Surtax'] - depreciation - cashflow_df.loc[i + 1, 'Battery_Replacement']
-            profit_list.append(profit)
-
-        table = pd.DataFrame({
-            '年份': [f'第{i}年' for i in range(1, StorageConstants.OPERATION_PERIOD + 1)],
-            '营业收入(不含税,万元)': cashflow_df['Revenue_Exc'].values,
-            '充电成本(万元)': cashflow_df['Charge_Cost'].values,
-            '营业税金及附加(万元)': cashflow_df['Surtax'].values,
-            '总成本费用(万元)': cashflow_df['OM_Cost'].values + cashflow_df['Battery_Replacement'].values + depreciation_list,
-            '利润总额(万元)': profit_list,
-            '所得税(万元)': cashflow_df['Income_Tax'].values,
-            '净利润(万元)': [p - t for p, t in zip(profit_list, cashflow_df['Income_Tax'].values)],
-        })
-
-        table['累计净利润(万元)'] = table['净利润(万元)'].cumsum()
+        columns = self._total_cost_columns()
+        table = pd.DataFrame(columns)
 
         if filename:
-            table.to_csv(filename, index=False, encoding='utf-8-sig')
-            logger.info(f"利润表已保存到: {filename}")
+            _fast_csv_dump(filename, list(columns), list(columns.values()))
+            logger.info("总成本费用表已保存到: %s", filename)
 
         return table
 
-    def export_financial_summary_table(self, filename: Optional[str] = None) -> pd.DataFrame:
+    def _profit_columns(self) -> Dict[str, Any]:
+        """利润与利润分配表各列 (表头 -> 列数据)"""
+        cashflow_df = self._op_df
+
+        # 每年的折旧额 (分离电池与非电池资产, 由 calculate_cash_flow 生成)
+        depreciation_arr = self._depreciation_arr
+
+        rev_exc = cashflow_df['Revenue_Exc'].to_numpy()
+        charge_cost = cashflow_df['Charge_Cost'].to_numpy()
+        om_cost = cashflow_df['OM_Cost'].to_numpy()
+        surtax = cashflow_df['Surtax'].to_numpy()
+        battery_replacement = cashflow_df['Battery_Replacement'].to_numpy()
+
+        profit_arr = rev_exc - charge_cost - om_cost - surtax - depreciation_arr - battery_replacement
+        income_tax = cashflow_df['Income_Tax'].to_numpy()
+        net_profit = profit_arr - income_tax
+
+        return {
+            '年份': StorageConstants.YEAR_LABELS,
+            '营业收入(不含税,万元)': rev_exc,
+            '充电成本(万元)': charge_cost,
+            '营业税金及附加(万元)': surtax,
+            '总成本费用(万元)': om_cost + battery_replacement + depreciation_arr,
+            '利润总额(万元)': profit_arr,
+            '所得税(万元)': income_tax,
+            '净利润(万元)': net_profit,
+            '累计净利润(万元)': net_profit.cumsum(),
+        }
+
+    def export_profit_table(self, filename: Optional[str] = None) -> pd.DataFrame:
         """
-        导出财务指标汇总表
+        导出利润与利润分配表
 
         Args:
             filename: 输出文件名
@@ -668,13 +1130,24 @@ class StorageProject:
         if self.df is None:
             raise CalculationError("请先运行 calculate_cash_flow()")
 
+        columns = self._profit_columns()
+        table = pd.DataFrame(columns)
+
+        if filename:
+            _fast_csv_dump(filename, list(columns), list(columns.values()))
+            logger.info("利润表已保存到: %s", filename)
+
+        return table
+
+    def _financial_summary_columns(self) -> Dict[str, Any]:
+        """财务指标汇总表各列 (表头 -> 列数据)"""
         metrics = self.get_metrics()
-        cashflow_df = self.df[self.df.index >= 2].copy()
+        cashflow_df = self._op_df
 
         total_profit = cashflow_df['Revenue_Exc'].sum() - cashflow_df['Charge_Cost'].sum() - cashflow_df['OM_Cost'].sum() - cashflow_df['Surtax'].sum()
         roi = total_profit / self.total_invest * 100
 
-        table = pd.DataFrame({
+        return {
             '指标': [
                 '项目总投资(万元)',
                 '建设期利息(万元)',
@@ -703,24 +1176,181 @@ class StorageProject:
                 round(self.static_invest / (self.capacity_mwh * 1000), 2),
                 round(self.efficiency * 100, 1),
             ],
-        })
+        }
+
+    def export_financial_summary_table(self, filename: Optional[str] = None) -> pd.DataFrame:
+        """
+        导出财务指标汇总表
+
+        Args:
+            filename: 输出文件名
+        """
+        if self.df is None:
+            raise CalculationError("请先运行 calculate_cash_flow()")
+
+        columns = self._financial_summary_columns()
+        table = pd.DataFrame(columns)
 
         if filename:
-            table.to_csv(filename, index=False, encoding='utf-8-sig')
-            logger.info(f"财务指标汇总表已保存到: {filename}")
+            _fast_csv_dump(filename, list(columns), list(columns.values()))
+            logger.info("财务指标汇总表已保存到: %s", filename)
 
         return table
 
+    def export_all(self, prefix: str = 'output_') -> Dict[str, str]:
+        """
+        一次导出全部财务报表
+
+        各报表所需列一次取出; 三张逐年报表同时打开, 按年份逐行写入,
+        结果与分别调用各 export_*_table 方法写出的文件相同。
+
+        Args:
+            prefix: 输出文件名前缀
+
+        Returns:
+            报表名称 -> 输出文件名
+        """
+        if self.df is None:
+            raise CalculationError("请先运行 calculate_cash_flow()")
+
+        yearly_tables = {
+            '收入和税金表': self._revenue_tax_columns(),
+            '总成本费用表': self._total_cost_columns(),
+            '利润表': self._profit_columns(),
+        }
+        summary_columns = self._financial_summary_columns()
+        filenames = {name: f'{prefix}{name}.csv' for name in (*yearly_tables, '财务指标汇总表')}
+
+        with ExitStack() as stack:
+            writers = []
+            row_iters = []
+            for name, columns in yearly_tables.items():
+                writer = _csv_writer(stack.enter_context(_open_csv(filenames[name])))
+                writer.writerow(list(columns))
+                writers.append(writer)
+                row_iters.append(zip(*(_csv_cells(col) for col in columns.values())))
+
+            for year_rows in zip(*row_iters):
+                for writer, row in zip(writers, year_rows):
+                    writer.writerow(row)
+
+        _fast_csv_dump(filenames['财务指标汇总表'], list(summary_columns), list(summary_columns.values()))
+
+        for name, filename in filenames.items():
+            logger.info("%s已保存到: %s", name, filename)
+        return filenames
+
 
 # ==============================================================================
 # 敏感性分析
 # ==============================================================================
 
+def _eval_sensitivity_point(base_params: Dict[str, Any], factor: str, new_value: float) -> float:
+    """
+    计算单个敏感性分析点 (模块级函数, 可被进程池序列化调用)
+
+    StorageProject 不保留参数字典, 因此直接在 base_params 上替换因素取值,
+    计算结束后恢复原值, 不为每个分析点复制参数字典。
+    进程池调用时各任务收到的是参数字典的序列化副本, 互不影响。
+
+    Args:
+        base_params: 基础项目参数 (计算期间临时修改, 返回前恢复)
+        factor: 要分析的因素
+        new_value: 因素取值
+
+    Returns:
+        全投资IRR(税前) (%)，计算失败时为 NaN
+    """
+    original = base_params[factor]
+    base_params[factor] = new_value
+
+    try:
+        project = StorageProject(base_params)
+        project.calculate_cash_flow()
+    except (StorageProjectError, ValueError) as e:
+        # 仅吞掉参数无效/计算失败; 其他异常视为程序错误直接抛出
+        logger.error("敏感性分析失败 (%s=%s): %s", factor, new_value, e)
+        return np.nan
+    finally:
+        base_params[factor] = original
+
+    # _irr_newton 无解时返回 NaN, 不抛出异常
+    return round(_irr_newton(project._net_cf_pre) * 100, 2)
+
+
+# 仅影响运营期收支、不改变投资与折旧计划的因素, 及其参数类型 (同参数校验)
+_OPEX_FACTORS = {
+    'charge_price': np.float64,
+    'discharge_price': np.float64,
+    'cycles_per_year': np.int64,
+    'lease_capacity': np.float64,
+    'lease_price': np.float64,
+    'ancillary_revenue': np.float64,
+}
+
+
+def _opex_sensitivity(
+    base_params: Dict[str, Any],
+    factor: str,
+    new_values: np.ndarray
+) -> Optional[np.ndarray]:
+    """
+    运营侧因素敏感性分析
+
+    基准项目的投资与折旧计划只计算一次; 将因素取值整体设为数组后,
+    运营期收支口径经一次广播运算得到 (steps,) 向量, 再由批量内核一次生成
+    (steps, 年数) 净现金流矩阵, 以基准 IRR 为初值并行求解各行 IRR,
+    不再逐点重建项目和现金流表。
+
+    Returns:
+        各取值对应的全投资IRR(税前) (%); 基准参数无效或该因素不适用于当前收益模式时返回 None,
+        由逐点计算路径处理 (并记录错误)
+    """
+    try:
+        base_project = StorageProject(base_params)
+        base_args, initial_outflow, terminal_inflow = base_project._prepare_kernel_inputs()
+    except (StorageProjectError, ValueError, TypeError):
+        # 与其他因素一致, 交由逐点计算路径记录错误或抛出
+        return None
+    if not hasattr(base_project, factor):
+        return None
+
+    steps = len(new_values)
+
+    # 因素取值整体替换为数组, 运营期收支口径按广播一次求出
+    project = copy.copy(base_project)
+    setattr(project, factor, new_values.astype(_OPEX_FACTORS[factor]))
+    kernel_args = np.tile(np.asarray(base_args, dtype=np.float64), (steps, 1))
+    kernel_args[:, _OPERATING_KERNEL_ARGS] = np.column_stack(
+        np.broadcast_arrays(*project._build_operating_flows(), np.empty(steps))[:-1]
+    )
+
+    cf_matrix = _batch_net_cash_flows(
+        kernel_args, np.full(steps, initial_outflow), np.full(steps, terminal_inflow)
+    )[0]
+
+    # 以基准情景 IRR 作为各点 Newton 迭代初值
+    base_cf = _net_cash_flows(np.asarray(base_args, dtype=np.float64), initial_outflow, terminal_inflow)[0]
+    base_irr = _irr_newton(base_cf)
+    guess = 0.08 if np.isnan(base_irr) else base_irr
+    return np.array([round(irr * 100, 2) for irr in _irr_newton_batch(cf_matrix, guess)])
+
+
+# 常用敏感性分析因素及其中文名称 (只读)
+FACTOR_NAMES = MappingProxyType({
+    'static_invest': '静态投资',
+    'discharge_price': '放电电价',
+    'charge_price': '充电电价',
+    'cycles_per_year': '循环次数',
+})
+
+
 def storage_sensitivity_analysis(
     base_params: Dict[str, Any],
     factor: str,
     variation_range: float = 0.10,
-    steps: int = 5
+    steps: int = 5,
+    n_jobs: int = 1
 ) -> pd.DataFrame:
     """
     储能项目单因素敏感性分析
@@ -730,47 +1360,100 @@ def storage_sensitivity_analysis(
         factor: 要分析的因素
         variation_range: 变化范围
         steps: 分析步数
+        n_jobs: 并行进程数, 1 为串行 (默认), -1 为使用全部 CPU 核心;
+            各分析点相互独立, 步数较多时可多进程并行。
+            运营侧因素 (电价、循环次数、租赁、辅助服务收入) 始终在一次向量化计算中完成, 不使用进程池。
+            进程池以 spawn 方式启动 (numba 并行内核的线程层不支持 fork),
+            脚本中的并行调用须置于 ``if __name__ == "__main__":`` 保护块内
 
     Returns:
         敏感性分析结果 DataFrame
     """
-    results = []
     base_value = base_params.get(factor)
 
     if base_value is None:
         raise ValueError(f"未知的因素: {factor}")
+    if n_jobs == 0:
+        raise ValueError("n_jobs 不能为 0")
 
     variations = np.linspace(-variation_range, variation_range, steps)
+    new_values = base_value * (1 + variations)
+    pct_labels = [f'{var*100:+.1f}%' for var in variations]
+
+    irrs = None
+    if factor in _OPEX_FACTORS:
+        # 运营侧因素: 复用基准项目的投资与折旧计划, 仅重算运营期收支 (不受 n_jobs 影响)
+        irrs = _opex_sensitivity(base_params, factor, new_values)
+
+    if irrs is None:
+        irrs = np.full(steps, np.nan)
+        if n_jobs == 1:
+            for i, new_value in enumerate(new_values):
+                irrs[i] = _eval_sensitivity_point(base_params, factor, new_value)
+        else:
+            max_workers = None if n_jobs < 0 else n_jobs
+            # 不使用 fork: 此前运行过的 numba 并行内核 (TBB 线程层) 在 fork 出的子进程中不安全,
+            # 会导致解释器退出时挂起
+            mp_context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+                irrs[:] = list(executor.map(
+                    _eval_sensitivity_point, repeat(base_params), repeat(factor), new_values
+                ))
+
+    df = pd.DataFrame({
+        '因素': factor,
+        '变化率': pct_labels,
+        '数值': new_values,
+        'IRR(税前)%': irrs,
+    })
+    logger.info("敏感性分析完成: 因素=%s", factor)
+    return df
 
-    for var in variations:
-        params_temp = base_params.copy()
-        new_value = base_value * (1 + var)
-        params_temp[factor] = new_value
 
-        try:
-            project = StorageProject(params_temp)
-            project.calculate_cash_flow()
-            metrics = project.get_metrics()
-            irr = metrics['全投资IRR(税前)']
-
-            results.append({
-                '因素': factor,
-                '变化率': f'{var*100:+.1f}%',
-                '数值': new_value,
-                'IRR(税前)%': irr,
-            })
-        except Exception as e:
-            logger.error(f"敏感性分析失败 (变化率={var*100:.1f}%): {e}")
-            results.append({
-                '因素': factor,
-                '变化率': f'{var*100:+.1f}%',
-                '数值': new_value,
-                'IRR(税前)%': None,
-            })
-
-    df = pd.DataFrame(results)
-    logger.info(f"敏感性分析完成: 因素={factor}")
-    return df
+def sweep_irr(
+    base_params: Dict[str, Any],
+    charge_prices: Any,
+    discharge_prices: Any
+) -> np.ndarray:
+    """
+    峰谷电价批量扫描
+
+    以 base_params 为基准, 逐点替换充/放电电价并计算全投资IRR(税前)。
+    全部扫描点在一个并行内核中完成, 不逐点构造 StorageProject 与 DataFrame。
+
+    Args:
+        base_params: 基础项目参数 (收益模式须为峰谷套利或混合模式)
+        charge_prices: 充电电价 (元/kWh), 标量或数组
+        discharge_prices: 放电电价 (元/kWh), 标量或数组, 与 charge_prices 按 NumPy 规则广播
+            (如 charge_prices[:, None] 与 discharge_prices[None, :] 构成二维网格)
+
+    Returns:
+        与广播后形状一致的 IRR(税前) 数组 (%)，无解时为 NaN
+
+    Raises:
+        InputValidationError: 收益模式不支持电价扫描
+        CalculationError: 计算失败
+    """
+    project = StorageProject(base_params)
+    if project.revenue_mode not in (StorageConstants.MODE_ARBITRAGE, StorageConstants.MODE_HYBRID):
+        raise InputValidationError("电价扫描仅适用于峰谷套利或混合模式")
+
+    charge_prices, discharge_prices = np.broadcast_arrays(
+        np.asarray(charge_prices, dtype=np.float64), np.asarray(discharge_prices, dtype=np.float64)
+    )
+
+    try:
+        kernel_args, initial_outflow, terminal_inflow = project._prepare_kernel_inputs()
+        n = charge_prices.size
+        args = np.tile(np.asarray(kernel_args, dtype=np.float64), (n, 1))
+        args[:, _KARG_DISCHARGE_REV], args[:, _KARG_CHARGE_COST] = project._arbitrage_flows(
+            project.cycles_per_year, discharge_prices.ravel(), charge_prices.ravel()
+        )
+        irrs = _batch_eval(args, np.full(n, initial_outflow), np.full(n, terminal_inflow))[0]
+    except Exception as e:
+        raise CalculationError(f"电价扫描失败: {e}") from e
+
+    return (irrs * 100).reshape(charge_prices.shape)
 
 
 # ==============================================================================
@@ -847,34 +1530,22 @@ def demo_storage_project() -> None:
         print("📄 正在生成财务报表...")
         print("=" * 70)
 
-        project.export_revenue_tax_table('output_收入和税金表.csv')
-        print("✅ 收入和税金表: output_收入和税金表.csv")
-
-        project.export_total_cost_table('output_总成本费用表.csv')
-        print("✅ 总成本费用表: output_总成本费用表.csv")
-
-        project.export_profit_table('output_利润表.csv')
-        print("✅ 利润与利润分配表: output_利润表.csv")
-
-        project.export_financial_summary_table('output_财务指标汇总表.csv')
-        print("✅ 财务指标汇总表: output_财务指标汇总表.csv")
+        for name, filename in project.export_all('output_').items():
+            print(f"✅ {name}: {filename}")
 
         # 敏感性分析
         print("\n" + "=" * 70)
         print("📈 正在进行敏感性分析...")
         print("=" * 70)
 
-        for factor in ['static_invest', 'discharge_price', 'charge_price', 'cycles_per_year']:
-            factor_names = {
-                'static_invest': '静态投资',
-                'discharge_price': '放电电价',
-                'charge_price': '充电电价',
-                'cycles_per_year': '循环次数'
-            }
-            sens_df = storage_sensitivity_analysis(demo_params, factor, variation_range=0.15, steps=5)
-            filename = f'output_敏感性分析_{factor_names[factor]}.csv'
-            sens_df.to_csv(filename, index=False, encoding='utf-8-sig')
-            print(f"✅ {factor_names[factor]}敏感性分析: {filename}")
+        sens_df = pd.concat(
+            [storage_sensitivity_analysis(demo_params, factor, variation_range=0.15, steps=5)
+             for factor in FACTOR_NAMES],
+            axis=0, ignore_index=True
+        )
+        filename = 'output_敏感性分析.csv'
+        _fast_csv_dump(filename, list(sens_df.columns), [sens_df[col].to_numpy() for col in sens_df.columns])
+        print(f"✅ 敏感性分析 ({'、'.join(FACTOR_NAMES.values())}): {filename}")
 
         print("=" * 70)
 
@@ -887,4 +1558,5 @@ def demo_storage_project() -> None:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
     demo_storage_project()
@@ -0,0 +1,201 @@
+"""storage_eval 数值引擎回归测试"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import storage_eval as se
+
+
+BASE_PARAMS = {
+    'power_mw': 100.0,
+    'capacity_mwh': 200.0,
+    'efficiency': 0.85,
+    'static_invest': 30000.0,
+    'loan_rate': 0.048,
+    'capital_ratio': 0.2,
+    'revenue_mode': 'arbitrage',
+    'cycles_per_year': 330,
+    'charge_price': 0.3,
+    'discharge_price': 0.9,
+    'battery_life': 10,
+    'replacement_cost': 21000.0,
+    'replacement_mode': 'expense',
+}
+
+SCENARIOS = {
+    'arbitrage': BASE_PARAMS,
+    'capitalize': dict(BASE_PARAMS, replacement_mode='capitalize', battery_life=4),
+    'capacity': {
+        'power_mw': 50.0, 'capacity_mwh': 100.0, 'static_invest': 15000.0,
+        'revenue_mode': 'capacity', 'lease_capacity': 50.0, 'lease_price': 30.0,
+    },
+    'frequency': {
+        'power_mw': 50.0, 'capacity_mwh': 50.0, 'static_invest': 10000.0,
+        'revenue_mode': 'ancillary', 'ancillary_type': 'frequency', 'ancillary_revenue': 3000.0,
+    },
+    'hybrid': dict(BASE_PARAMS, revenue_mode='hybrid', ancillary_revenue=500.0, battery_life=7),
+    'no_deductible': dict(BASE_PARAMS, deductible_tax=0.0),
+    'low_revenue': dict(BASE_PARAMS, discharge_price=0.33, cycles_per_year=100),
+}
+
+
+def _project(params):
+    project = se.StorageProject(params)
+    project.calculate_cash_flow()
+    return project
+
+
+# ==============================================================================
+# IRR 求解
+# ==============================================================================
+
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_irr_newton_matches_numpy_financial(name):
+    npf = pytest.importorskip('numpy_financial')
+    project = _project(SCENARIOS[name])
+
+    for column in ('Net_CF_Pre', 'Net_CF_After'):
+        cf = project.df[column].to_numpy()
+        assert se._irr_newton(cf) == pytest.approx(npf.irr(cf), abs=1e-6)
+
+
+@pytest.mark.parametrize('cf', [
+    # 电池更换年份净现金流转负
+    [-30000.0] + [4000.0] * 9 + [-17000.0] + [4000.0] * 9 + [5500.0],
+    [-10000.0] + [3500.0, 3500.0, 3500.0, -6500.0] * 4 + [3500.0] * 4,
+    [-100.0, 0.76],  # IRR = -99.24%
+])
+def test_irr_newton_reference_cash_flows(cf):
+    npf = pytest.importorskip('numpy_financial')
+    cf = np.array(cf)
+    assert se._irr_newton(cf) == pytest.approx(npf.irr(cf), abs=1e-6)
+
+
+def test_irr_newton_no_root():
+    assert np.isnan(se._irr_newton(np.array([-100.0, -10.0, -10.0])))
+
+
+# ==============================================================================
+# 项目参数
+# ==============================================================================
+
+def test_unknown_replacement_mode_is_capitalized():
+    capitalized = _project(dict(BASE_PARAMS, replacement_mode='capitalize')).get_metrics()
+    assert _project(dict(BASE_PARAMS, replacement_mode='other')).get_metrics() == capitalized
+
+
+def test_metrics_and_exports_follow_df_edits():
+    project = _project(BASE_PARAMS)
+    before = project.get_metrics()
+
+    project.df['Net_CF_Pre'] = project.df['Net_CF_Pre'] + 1000.0
+    project.df['Revenue_Inc'] = 0.0
+
+    assert project.get_metrics()['全投资IRR(税前)'] != before['全投资IRR(税前)']
+    assert project.get_metrics()['全投资IRR(税后)'] == before['全投资IRR(税后)']
+    assert (project.export_revenue_tax_table()['营业收入(含税,万元)'] == 0.0).all()
+
+
+# ==============================================================================
+# 批量评价与电价扫描
+# ==============================================================================
+
+def test_batch_matches_get_metrics():
+    params_df = pd.DataFrame.from_dict(SCENARIOS, orient='index')
+    result = se.StorageProject.batch(params_df)
+
+    for name, params in SCENARIOS.items():
+        expected = _project(params).get_metrics()
+        assert result.loc[name].to_dict() == pytest.approx(expected)
+
+
+def test_sweep_irr_matches_get_metrics():
+    charge = np.array([0.2, 0.3])
+    discharge = np.array([0.8, 0.9, 1.0])
+    grid = se.sweep_irr(BASE_PARAMS, charge[:, None], discharge[None, :])
+
+    assert grid.shape == (2, 3)
+    for i, charge_price in enumerate(charge):
+        for j, discharge_price in enumerate(discharge):
+            params = dict(BASE_PARAMS, charge_price=charge_price, discharge_price=discharge_price)
+            expected = _project(params).get_metrics()['全投资IRR(税前)']
+            assert round(grid[i, j], 2) == pytest.approx(expected)
+
+
+# ==============================================================================
+# 敏感性分析
+# ==============================================================================
+
+def test_parallel_sensitivity_after_numba_parallel_kernels(tmp_path):
+    # 先运行 numba 并行内核再启动进程池: fork 方式下解释器退出时会挂起
+    script = tmp_path / 'parallel_after_kernels.py'
+    script.write_text(textwrap.dedent(f"""
+        import storage_eval as se
+
+        if __name__ == '__main__':
+            base = {BASE_PARAMS!r}
+            se.sweep_irr(base, [0.2, 0.3], 0.9)
+            se.storage_sensitivity_analysis(base, 'charge_price', 0.15, 5)
+            df = se.storage_sensitivity_analysis(base, 'static_invest', 0.15, 5, n_jobs=2)
+            print(df['IRR(税前)%'].tolist())
+    """), encoding='utf-8')
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(se.__file__)))
+
+    proc = subprocess.run(
+        [sys.executable, str(script)], env=env, capture_output=True, text=True, timeout=120
+    )
+
+    assert proc.returncode == 0, proc.stderr
+    serial = se.storage_sensitivity_analysis(BASE_PARAMS, 'static_invest', 0.15, 5)
+    assert proc.stdout.strip() == str(serial['IRR(税前)%'].tolist())
+
+
+@pytest.mark.parametrize('factor', ['static_invest', 'charge_price'])
+def test_sensitivity_invalid_base_params_gives_nan_rows(factor):
+    params = dict(BASE_PARAMS, efficiency='bad')
+
+    df = se.storage_sensitivity_analysis(params, factor, 0.15, 3)
+
+    assert df['IRR(税前)%'].isna().all()
+
+
+def test_opex_sensitivity_is_vectorized_for_any_n_jobs(monkeypatch):
+    serial = se.storage_sensitivity_analysis(BASE_PARAMS, 'discharge_price', 0.15, 5)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError('运营侧因素不应使用进程池')
+
+    monkeypatch.setattr(se, 'ProcessPoolExecutor', no_pool)
+    parallel = se.storage_sensitivity_analysis(BASE_PARAMS, 'discharge_price', 0.15, 5, n_jobs=2)
+
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+# ==============================================================================
+# 报表导出
+# ==============================================================================
+
+@pytest.mark.parametrize('cashflow_dtype', ['float64', 'float32'])
+def test_export_all_matches_individual_exports(tmp_path, cashflow_dtype):
+    project = _project(dict(BASE_PARAMS, cashflow_dtype=cashflow_dtype))
+    exporters = {
+        '收入和税金表': project.export_revenue_tax_table,
+        '总成本费用表': project.export_total_cost_table,
+        '利润表': project.export_profit_table,
+        '财务指标汇总表': project.export_financial_summary_table,
+    }
+
+    filenames = project.export_all(str(tmp_path / 'all_'))
+
+    assert set(filenames) == set(exporters)
+    for name, export in exporters.items():
+        single = tmp_path / f'single_{name}.csv'
+        table = export(str(single))
+        assert (tmp_path / f'all_{name}.csv').read_bytes() == single.read_bytes()
+        assert single.read_bytes() == table.to_csv(index=False).encode('utf-8-sig')